@@ -1,9 +1,9 @@
 """Command-line interface - Argument parsing and URL handling."""
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import NamedTuple
-from urllib.parse import urlparse
 
 from .config import DEFAULT_TIMEOUT, get_default_download_dir
 
@@ -41,6 +41,7 @@ def print_usage() -> None:
     print("  python -m client localhost 8080 /subdir/ downloads")
 
 
+@lru_cache(maxsize=1024)
 def parse_url(url: str) -> tuple[str, int, str]:
     """
     Parse URL into host, port, and path.
@@ -54,11 +55,14 @@ def parse_url(url: str) -> tuple[str, int, str]:
     Raises:
         ValueError: If URL is invalid
     """
+    # Imported lazily so --help and argument errors don't pay for urllib.parse
+    from urllib.parse import urlsplit
+
     # Add scheme if missing
     if not url.startswith(("http://", "https://")):
         url = "http://" + url
 
-    parsed = urlparse(url)
+    parsed = urlsplit(url)
 
     # Extract host
     host = parsed.hostname
@@ -87,61 +91,60 @@ def parse_arguments(args: list[str]) -> ClientArgs:
     Raises:
         ValueError: If arguments are invalid
     """
-    if len(args) == 0:
-        raise ValueError("No arguments provided")
-
-    # Case 1: URL format (1 or 2 arguments)
-    # python -m client <url> [directory]
-    if len(args) <= 2 and "/" in args[0]:
-        url = args[0]
-        directory = args[1] if len(args) == 2 else str(get_default_download_dir())
-
-        try:
-            host, port, path = parse_url(url)
-        except ValueError as e:
-            raise ValueError(f"Invalid URL: {e}")
-
-        return ClientArgs(
-            host=host,
-            port=port,
-            path=path,
-            directory=Path(directory),
-            timeout=DEFAULT_TIMEOUT,
-        )
-
-    # Case 2: Separate arguments format (3 or 4 arguments)
-    # python -m client <host> <port> <path> [directory]
-    if len(args) in (3, 4):
-        host = args[0]
-        port_str = args[1]
-        path = args[2]
-        directory = args[3] if len(args) == 4 else str(get_default_download_dir())
-
-        # Validate host
-        if not host:
-            raise ValueError("Server host cannot be empty")
-
-        # Validate and parse port
-        try:
-            port = int(port_str)
+    match len(args):
+        case 0:
+            raise ValueError("No arguments provided")
+
+        # Case 1: URL format (1 or 2 arguments)
+        # python -m client <url> [directory]
+        case 1 | 2 if "/" in args[0]:
+            url = args[0]
+            directory = args[1] if len(args) == 2 else str(get_default_download_dir())
+
+            try:
+                host, port, path = parse_url(url)
+            except ValueError as e:
+                raise ValueError(f"Invalid URL: {e}")
+
+            return ClientArgs(
+                host=host,
+                port=port,
+                path=path,
+                directory=Path(directory),
+                timeout=DEFAULT_TIMEOUT,
+            )
+
+        # Case 2: Separate arguments format (3 or 4 arguments)
+        # python -m client <host> <port> <path> [directory]
+        case 3 | 4:
+            host = args[0]
+            port_str = args[1]
+            path = args[2]
+            directory = args[3] if len(args) == 4 else str(get_default_download_dir())
+
+            # Validate host
+            if not host:
+                raise ValueError("Server host cannot be empty")
+
+            # Validate and parse port
+            try:
+                port = int(port_str)
+            except ValueError:
+                raise ValueError(f"Port must be a number, got '{port_str}'")
             if port < 1 or port > 65535:
                 raise ValueError(f"Port must be between 1 and 65535, got {port}")
-        except ValueError as e:
-            if "invalid literal" in str(e):
-                raise ValueError(f"Port must be a number, got '{port_str}'")
-            raise
-
-        # Validate URL path
-        if not path:
-            raise ValueError("URL path cannot be empty")
-
-        return ClientArgs(
-            host=host,
-            port=port,
-            path=path,
-            directory=Path(directory),
-            timeout=DEFAULT_TIMEOUT,
-        )
+
+            # Validate URL path
+            if not path:
+                raise ValueError("URL path cannot be empty")
+
+            return ClientArgs(
+                host=host,
+                port=port,
+                path=path,
+                directory=Path(directory),
+                timeout=DEFAULT_TIMEOUT,
+            )
 
     # Invalid number of arguments
     raise ValueError(f"Invalid number of arguments: {len(args)}")
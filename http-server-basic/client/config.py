@@ -1,5 +1,6 @@
 """Client configuration and constants."""
 
+import sys
 from pathlib import Path
 
 # Default settings
@@ -13,15 +14,20 @@ RECV_BUFFER_SIZE = 4096
 HEADER_SEPARATOR = b"\r\n\r\n"
 
 # Content types that should be printed
-TEXT_CONTENT_TYPES = {"text/html", "text/plain"}
+TEXT_CONTENT_TYPES = frozenset(map(sys.intern, {"text/html", "text/plain"}))
 
 # Content types that should be saved to disk
-BINARY_CONTENT_TYPES = {
-    "image/png",
-    "image/jpeg",
-    "image/jpg",
-    "application/pdf",
-}
+BINARY_CONTENT_TYPES = frozenset(
+    map(
+        sys.intern,
+        {
+            "image/png",
+            "image/jpeg",
+            "image/jpg",
+            "application/pdf",
+        },
+    )
+)
 
 
 # Get default download directory path
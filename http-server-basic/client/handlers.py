@@ -1,18 +1,27 @@
 """Response handlers - Handle different content types."""
 
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 from .config import BINARY_CONTENT_TYPES, TEXT_CONTENT_TYPES
 from .http_protocol import HTTPResponse
 
 
+@lru_cache(maxsize=256)
+def parse_content_type(value: str) -> str:
+    """Return the main media type of a Content-Type value, ignoring parameters."""
+    # Interned so membership tests against the content type sets in config
+    # can short-circuit on identity
+    return sys.intern(value.split(";", 1)[0].strip().lower())
+
+
 def get_content_type(headers: dict[str, str]) -> str:
-    """Extract content type from headers (case-insensitive)."""
-    for key, value in headers.items():
-        if key.lower() == "content-type":
-            # Return main type, ignore charset parameters
-            return value.split(";")[0].strip().lower()
-    return "application/octet-stream"
+    """Extract content type from headers (keys are lowercased by the parser)."""
+    value = headers.get("content-type")
+    if value is None:
+        return "application/octet-stream"
+    return parse_content_type(value)
 
 
 def get_filename_from_path(url_path: str) -> str:
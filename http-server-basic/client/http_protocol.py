@@ -11,7 +11,7 @@ class HTTPResponse(NamedTuple):
 
     status_code: int
     status_text: str
-    headers: dict[str, str]
+    headers: dict[str, str]  # Header names are lowercased
     body: bytes
 
 
@@ -108,21 +108,20 @@ def parse_response(data: bytes) -> HTTPResponse:
 
     header_section, body = data.split(HEADER_SEPARATOR, 1)
 
-    # Decode headers
-    try:
-        header_text = header_section.decode("utf-8")
-    except UnicodeDecodeError:
-        raise ValueError("Invalid HTTP response: headers not UTF-8")
-
-    lines = header_text.strip().split("\r\n")
+    # Split on bytes and decode only the pieces that are kept, rather than
+    # decoding the whole header block first
+    lines = header_section.strip().split(b"\r\n")
     if not lines:
         raise ValueError("Invalid HTTP response: empty headers")
 
-    # Parse status line
-    status_code, status_text = parse_status_line(lines[0])
+    try:
+        # Parse status line
+        status_code, status_text = parse_status_line(lines[0].decode("utf-8"))
 
-    # Parse headers
-    headers = parse_headers(lines[1:])
+        # Parse headers
+        headers = parse_headers(lines[1:])
+    except UnicodeDecodeError:
+        raise ValueError("Invalid HTTP response: headers not UTF-8")
 
     return HTTPResponse(
         status_code=status_code, status_text=status_text, headers=headers, body=body
@@ -158,20 +157,23 @@ def parse_status_line(status_line: str) -> tuple[int, str]:
     return status_code, status_text
 
 
-def parse_headers(header_lines: list[str]) -> dict[str, str]:
+def parse_headers(header_lines: list[bytes]) -> dict[str, str]:
     """
     Parse HTTP headers.
 
     Args:
-        header_lines: List of header lines
+        header_lines: List of raw header lines
 
     Returns:
-        Dictionary of header key-value pairs
+        Dictionary of header key-value pairs, keyed by lowercased header name
+
+    Raises:
+        UnicodeDecodeError: If a header line is not valid UTF-8
     """
     headers = {}
     for line in header_lines:
-        if ":" not in line:
+        key, sep, value = line.partition(b":")
+        if not sep:
             continue
-        key, value = line.split(":", 1)
-        headers[key.strip()] = value.strip()
+        headers[key.strip().decode("utf-8").lower()] = value.strip().decode("utf-8")
     return headers
@@ -1,10 +1,20 @@
 """Command-line interface - Argument parsing and application entry point."""
 
+import os
 import sys
 import argparse
 import logging
 from pathlib import Path
-from .config import HOST, PORT, LOG_LEVELS, DEFAULT_LOG_LEVEL, ENABLE_DIR_LISTING
+from .config import (
+    HOST,
+    PORT,
+    LOG_LEVELS,
+    DEFAULT_LOG_LEVEL,
+    ENABLE_DIR_LISTING,
+    BACKENDS,
+    SERVER_BACKEND,
+    WORKERS,
+)
 from .server import SimpleHTTPServer
 
 
@@ -21,6 +31,9 @@ Examples:
   %(prog)s -p 3000                  # Use port 3000
   %(prog)s -d ./dist -p 8000        # Serve ./dist on port 8000
   %(prog)s --host 127.0.0.1         # Listen only on localhost
+  %(prog)s --backend asyncio        # Serve from a single asyncio event loop
+  %(prog)s --workers 4              # Four processes sharing the port
+  %(prog)s --workers 0              # One process per CPU core
         """,
     )
 
@@ -63,6 +76,22 @@ Examples:
         "Levels: debug (all), info, warning, error, none (no logs)",
     )
 
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=SERVER_BACKEND,
+        help=f"Concurrency backend (default: {SERVER_BACKEND}). "
+        "threads: thread pool of blocking handlers, asyncio: single event loop",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help=f"Number of server processes sharing the port via SO_REUSEPORT, "
+        f"0 for one per CPU core (default: {WORKERS})",
+    )
+
     return parser.parse_args()
 
 
@@ -90,9 +119,8 @@ def validate_directory(directory: str) -> Path:
         print(f"Error: '{directory}' is not a directory", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        list(base_dir.iterdir())
-    except PermissionError:
+    # One access() check instead of listing the whole directory
+    if not os.access(base_dir, os.R_OK | os.X_OK):
         print(
             f"Error: Permission denied to read directory '{directory}'",
             file=sys.stderr,
@@ -109,6 +137,14 @@ def validate_port(port: int) -> None:
         sys.exit(1)
 
 
+def validate_workers(workers: int) -> int:
+    """Validate the worker process count, resolving 0 to the CPU count."""
+    if workers < 0:
+        print(f"Error: Workers must be 0 or more, got {workers}", file=sys.stderr)
+        sys.exit(1)
+    return workers or os.cpu_count() or 1
+
+
 def configure_logging(log_level: str) -> None:
     """Configure logging based on the specified level."""
     level = LOG_LEVELS.get(log_level, logging.INFO)
@@ -124,12 +160,16 @@ def configure_logging(log_level: str) -> None:
         )
 
 
+_DIR_LISTING_TRUE = frozenset({"enabled", "enable", "true", "1", "yes", "on"})
+_DIR_LISTING_FALSE = frozenset({"disabled", "disable", "false", "0", "no", "off"})
+
+
 def parse_dir_listing(value: str) -> bool:
     """Parse directory listing argument."""
     value_lower = value.lower()
-    if value_lower in ("enabled", "enable", "true", "1", "yes", "on"):
+    if value_lower in _DIR_LISTING_TRUE:
         return True
-    elif value_lower in ("disabled", "disable", "false", "0", "no", "off"):
+    elif value_lower in _DIR_LISTING_FALSE:
         return False
     else:
         raise argparse.ArgumentTypeError(
@@ -143,6 +183,8 @@ def print_startup_banner(
     directory: Path,
     dir_listing: bool = ENABLE_DIR_LISTING,
     log_level: str = DEFAULT_LOG_LEVEL,
+    backend: str = SERVER_BACKEND,
+    workers: int = WORKERS,
 ) -> None:
     """Print server startup information."""
     print("Starting HTTP server...")
@@ -151,6 +193,8 @@ def print_startup_banner(
     print(f"  Directory: {directory}")
     print(f"  Directory Listing: {'Enabled' if dir_listing else 'Disabled'}")
     print(f"  Log Level: {log_level}")
+    print(f"  Backend: {backend}")
+    print(f"  Workers: {workers}")
     print()
 
 
@@ -158,12 +202,19 @@ def main():
     """Main entry point for the HTTP server."""
     args = parse_arguments()
     validate_port(args.port)
+    workers = validate_workers(args.workers)
     base_dir = validate_directory(args.directory)
 
     configure_logging(args.log_level)
 
     print_startup_banner(
-        args.host, args.port, base_dir, args.dir_listing, args.log_level
+        args.host,
+        args.port,
+        base_dir,
+        args.dir_listing,
+        args.log_level,
+        args.backend,
+        workers,
     )
 
     try:
@@ -172,6 +223,8 @@ def main():
             port=args.port,
             base_dir=str(base_dir),
             allow_directory_listing=args.dir_listing,
+            backend=args.backend,
+            workers=workers,
         )
         server.serve_forever()
     except OSError as e:
@@ -2,6 +2,7 @@
 
 import os
 import logging
+import socket
 
 HOST = os.getenv("SERVER_HOST", "0.0.0.0")
 PORT = int(os.getenv("SERVER_PORT", 8080))
@@ -28,6 +29,7 @@ DEFAULT_LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
 
 STATUS_TEXT = {
     200: "OK",
+    304: "Not Modified",
     308: "Permanent Redirect",
     400: "Bad Request",
     403: "Forbidden",
@@ -37,15 +39,47 @@ STATUS_TEXT = {
     500: "Internal Server Error",
 }
 
-BACKLOG = 100
+# Accept queue length; the kernel caps it at net.core.somaxconn
+BACKLOG = int(os.getenv("BACKLOG", str(socket.SOMAXCONN)))
 CLIENT_TIMEOUT_SECONDS = int(os.getenv("CLIENT_TIMEOUT", "5"))
+KEEPALIVE_MAX_REQUESTS = int(os.getenv("KEEPALIVE_MAX_REQUESTS", "100"))
+KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("KEEPALIVE_TIMEOUT", "2.0"))
+CLIENT_SNDBUF_BYTES = int(os.getenv("CLIENT_SNDBUF_BYTES", str(256 * 1024)))
 HEADER_END = b"\r\n\r\n"
 MAX_HEADER_BYTES = 64 * 1024
 SERVER_NAME = "SimplePythonSocketHTTP/1.0"
+ERROR_CACHE_SIZE = 64  # Rendered error pages with custom messages kept
+HEADER_LINE_CACHE_SIZE = 1024  # Encoded "Name: value" header lines kept
+
+# Static file cache settings
+FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+FILE_CACHE_MAX_FILE_BYTES = int(os.getenv("FILE_CACHE_MAX_FILE_BYTES", str(256 * 1024)))
+PATH_CACHE_SIZE = int(os.getenv("PATH_CACHE_SIZE", "1024"))  # Resolved request paths
+
+# Sent with static files; clients revalidate with If-None-Match afterwards
+CACHE_CONTROL = os.getenv("CACHE_CONTROL", "public, max-age=600")
+
+# Directory listing cache settings
+DIR_LISTING_CACHE_SIZE = int(os.getenv("DIR_LISTING_CACHE_SIZE", "256"))
+DIR_LISTING_CACHE_TTL = float(os.getenv("DIR_LISTING_CACHE_TTL", "2.0"))
 
 # Concurrency settings
-MAX_WORKERS = int(os.getenv("MAX_WORKERS", "10"))
+BACKENDS = ("threads", "asyncio")
+SERVER_BACKEND = os.getenv("SERVER_BACKEND", "threads").lower()
+# Keep-alive connections hold a worker while idle, so size the pool by cores
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", str(max(10, (os.cpu_count() or 1) * 4))))
+# Processes sharing the port. Each keeps its own request counter and rate
+# limiter, so with N workers a client may get up to N times the burst and
+# refill rate, and listing counts cover one worker's share of the traffic
+WORKERS = int(os.getenv("WORKERS", "1"))
+# The asyncio backend runs on uvloop when it is installed, unless disabled
+USE_UVLOOP = os.getenv("USE_UVLOOP", "true").lower() in ("true", "1", "yes")
+COUNTER_SHARDS = int(os.getenv("COUNTER_SHARDS", "16"))
+COUNTER_MAX_PATHS = int(os.getenv("COUNTER_MAX_PATHS", "100000"))
 
-# Rate limiting settings
+# Rate limiting settings: a token bucket of RATE_LIMIT_REQUESTS per IP that
+# refills completely over RATE_LIMIT_WINDOW seconds
 RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "5"))
 RATE_LIMIT_WINDOW = float(os.getenv("RATE_LIMIT_WINDOW", "1.0"))
+RATE_LIMIT_MAX_TRACKED = int(os.getenv("RATE_LIMIT_MAX_TRACKED", "10000"))
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
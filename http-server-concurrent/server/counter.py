@@ -1,15 +1,40 @@
 """Thread-safe request counter for tracking requests per file path."""
 
 import threading
-from collections import defaultdict
+from collections import OrderedDict
+
+from .config import COUNTER_MAX_PATHS, COUNTER_SHARDS
 
 
 class RequestCounter:
-    """Thread-safe counter for tracking requests to each file path."""
+    """
+    Thread-safe counter for tracking requests to each file path.
+
+    Counts are split across shards, each guarded by its own lock, so
+    concurrent requests for different paths rarely contend on the same lock.
+
+    The number of tracked paths is bounded: once a shard is full, the least
+    recently requested path in it is forgotten, so probing random URLs
+    cannot grow memory without limit.
+    """
+
+    def __init__(
+        self, shards: int = COUNTER_SHARDS, max_paths: int = COUNTER_MAX_PATHS
+    ):
+        """
+        Initialize the request counter.
+
+        Args:
+            shards: Number of lock-protected shards (rounded up to a power of two)
+            max_paths: Approximate maximum number of paths tracked at once
+        """
+        size = 1 << max(0, shards - 1).bit_length()
+        self._mask = size - 1
+        self._max_per_shard = max(1, max_paths // size)
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(size)]
 
-    def __init__(self):
-        self._counts = defaultdict(int)
-        self._lock = threading.Lock()
+    def _shard(self, path: str) -> tuple[threading.Lock, OrderedDict[str, int]]:
+        return self._shards[hash(path) & self._mask]
 
     def increment(self, path: str) -> int:
         """
@@ -18,9 +43,13 @@ class RequestCounter:
         Returns:
             The new count for this path.
         """
-        with self._lock:
-            self._counts[path] += 1
-            return self._counts[path]
+        lock, counts = self._shard(path)
+        with lock:
+            count = counts.pop(path, 0) + 1
+            counts[path] = count
+            if len(counts) > self._max_per_shard:
+                counts.popitem(last=False)
+            return count
 
     def get(self, path: str) -> int:
         """
@@ -29,8 +58,28 @@ class RequestCounter:
         Returns:
             The count for this path, or 0 if never accessed.
         """
-        with self._lock:
-            return self._counts[path]
+        lock, counts = self._shard(path)
+        with lock:
+            return counts.get(path, 0)
+
+    def get_many(self, paths: list[str]) -> dict[str, int]:
+        """
+        Get the counts for several paths, taking each shard's lock once.
+
+        Returns:
+            A dictionary of path -> count, with 0 for paths never accessed.
+        """
+        by_shard: dict[int, list[str]] = {}
+        for path in paths:
+            by_shard.setdefault(hash(path) & self._mask, []).append(path)
+
+        result: dict[str, int] = {}
+        for index, shard_paths in by_shard.items():
+            lock, counts = self._shards[index]
+            with lock:
+                for path in shard_paths:
+                    result[path] = counts.get(path, 0)
+        return result
 
     def get_all(self) -> dict[str, int]:
         """
@@ -39,5 +88,8 @@ class RequestCounter:
         Returns:
             A dictionary of path -> count mappings.
         """
-        with self._lock:
-            return dict(self._counts)
+        snapshot: dict[str, int] = {}
+        for lock, counts in self._shards:
+            with lock:
+                snapshot.update(counts)
+        return snapshot
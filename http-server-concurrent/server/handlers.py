@@ -1,16 +1,103 @@
 """Request handlers - Client connection handling and request routing."""
 
+import asyncio
+import os
 import socket
+import stat
+import threading
+import time
 import logging
-from .http_protocol import RequestReceiver, RequestParser, ResponseBuilder
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import BinaryIO
+from .http_protocol import (
+    HTTPRequest,
+    RequestReceiver,
+    RequestParser,
+    ResponseBuilder,
+    Response,
+)
+from .network import corked, send_buffers
 from .services import StaticFileService
-from .config import SUPPORTED_METHODS
+from .config import (
+    CACHE_CONTROL,
+    DIR_LISTING_CACHE_SIZE,
+    DIR_LISTING_CACHE_TTL,
+    KEEPALIVE_MAX_REQUESTS,
+    KEEPALIVE_TIMEOUT_SECONDS,
+    SUPPORTED_METHODS,
+)
 from .counter import RequestCounter
 from .rate_limiter import RateLimiter
 
+_COPY_CHUNK = 256 * 1024  # Read size when a file can't go through sendfile
+
+
+def _etag(mtime_ns: int, size: int) -> str:
+    """Weak validator for a file version; changes whenever mtime or size does."""
+    return f'W/"{mtime_ns:x}-{size:x}"'
+
+
+def _not_modified(req: HTTPRequest, etag: str, mtime: float) -> bool:
+    """
+    Whether the client's cached copy is still current (RFC 9110 13.1).
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it. The parser lowercases header values, so tags compare
+    lowercased too, and weak comparison ignores the W/ prefix. An
+    If-Modified-Since date later than now is ignored.
+    """
+    if req.if_none_match is not None:
+        if req.if_none_match == "*":
+            return True
+        want = etag.lower().removeprefix("w/")
+        return any(
+            tag.strip().removeprefix("w/") == want
+            for tag in req.if_none_match.split(",")
+        )
+
+    if req.if_modified_since is not None:
+        try:
+            date = parsedate_to_datetime(req.if_modified_since)
+        except (TypeError, ValueError):
+            return False  # Unparseable dates are ignored
+        # HTTP dates are always GMT; the asctime form parses without a zone
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        since = date.timestamp()
+        if since > time.time():
+            return False  # A date in the future is invalid and ignored
+        # HTTP dates have one-second resolution
+        return int(mtime) <= since
+
+    return False
+
+
+async def _copy_file(
+    loop: asyncio.AbstractEventLoop,
+    writer: asyncio.StreamWriter,
+    f: BinaryIO,
+    size: int,
+) -> None:
+    """Stream ``size`` bytes of a file to the writer, reading off the loop."""
+    remaining = size
+    while remaining > 0:
+        chunk = await loop.run_in_executor(None, f.read, min(remaining, _COPY_CHUNK))
+        if not chunk:
+            break
+        writer.write(chunk)
+        await writer.drain()
+        remaining -= len(chunk)
+
 
 class ClientHandler:
-    """Coordinates receive -> parse -> route -> respond for one client socket."""
+    """Coordinates receive -> parse -> route -> respond for one client connection.
+
+    Routing lives in respond(), which only produces a Response; handle() and
+    handle_async() are the blocking-socket and asyncio transports around it.
+    """
 
     def __init__(
         self,
@@ -21,6 +108,11 @@ class ClientHandler:
         logger: logging.Logger | None = None,
         counter: RequestCounter | None = None,
         rate_limiter: RateLimiter | None = None,
+        listing_cache_size: int = DIR_LISTING_CACHE_SIZE,
+        listing_cache_ttl: float = DIR_LISTING_CACHE_TTL,
+        keepalive_max_requests: int = KEEPALIVE_MAX_REQUESTS,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT_SECONDS,
+        cache_control: str = CACHE_CONTROL,
     ):
         self.receiver = receiver
         self.parser = parser
@@ -29,132 +121,420 @@ class ClientHandler:
         self.logger = logger or logging.getLogger(__name__)
         self.counter = counter
         self.rate_limiter = rate_limiter
+        self.listing_cache_size = listing_cache_size
+        self.listing_cache_ttl = listing_cache_ttl
+        self.keepalive_max_requests = keepalive_max_requests
+        self.keepalive_timeout = keepalive_timeout
+        self.cache_control = cache_control
+        # (request path, directory, keep_alive) ->
+        #     (mtime_ns, expires, paths, counts, response, entry count)
+        self._listing_cache: OrderedDict[tuple[str, Path, bool], tuple] = (
+            OrderedDict()
+        )
+        self._listing_lock = threading.Lock()
 
     def handle(self, client_socket: socket.socket, client_addr: tuple = None) -> None:
-        req = None
+        """Serve requests on a connection until it stops being persistent."""
         addr_str = f"{client_addr[0]}:{client_addr[1]}" if client_addr else "unknown"
         client_ip = client_addr[0] if client_addr else "unknown"
+        pending = bytearray()  # Bytes already read for the next request
+        served = 0
 
         try:
-            # Check rate limit first
-            if self.rate_limiter and not self.rate_limiter.is_allowed(client_ip):
-                self.logger.warning(
-                    f"{addr_str} - 429 Too Many Requests: Rate limit exceeded"
+            while True:
+                try:
+                    request_text = self.receiver.receive(
+                        client_socket, pending, self._idle_timeout(served)
+                    )
+                except ValueError as e:
+                    client_socket.sendall(self._bad_request(addr_str, e).data)
+                    return
+                if served and not request_text:
+                    return  # Client closed or went idle between requests
+
+                if not self._check_rate_limit(client_ip, addr_str):
+                    client_socket.sendall(self.responses.error(429))
+                    return
+
+                served += 1
+                response = self.respond(
+                    request_text, addr_str, served < self.keepalive_max_requests
+                )
+                self._send(client_socket, response)
+                if not response.keep_alive:
+                    return
+
+        except Exception as e:
+            self.logger.exception(
+                "%s - 500 Internal Server Error: (unknown) - %s", addr_str, e
+            )
+            client_socket.sendall(self.responses.error(500))
+        finally:
+            try:
+                client_socket.close()
+            except Exception:
+                pass
+
+    async def handle_async(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client_addr = writer.get_extra_info("peername")
+        addr_str = f"{client_addr[0]}:{client_addr[1]}" if client_addr else "unknown"
+        client_ip = client_addr[0] if client_addr else "unknown"
+        loop = asyncio.get_running_loop()
+        served = 0
+
+        try:
+            while True:
+                try:
+                    request_text = await self.receiver.receive_stream(
+                        reader, idle_timeout=self._idle_timeout(served)
+                    )
+                except ValueError as e:
+                    writer.write(self._bad_request(addr_str, e).data)
+                    await writer.drain()
+                    return
+                if served and not request_text:
+                    return
+
+                if not self._check_rate_limit(client_ip, addr_str):
+                    writer.write(self.responses.error(429))
+                    await writer.drain()
+                    return
+
+                served += 1
+                # respond() stats and reads files, so keep it off the event loop
+                response = await loop.run_in_executor(
+                    None,
+                    self.respond,
+                    request_text,
+                    addr_str,
+                    served < self.keepalive_max_requests,
                 )
-                client_socket.sendall(self.responses.error(429))
-                return
+                await self._send_async(writer, response)
+                if not response.keep_alive:
+                    return
+
+        except Exception as e:
+            self.logger.exception(
+                "%s - 500 Internal Server Error: (unknown) - %s", addr_str, e
+            )
+            writer.write(self.responses.error(500))
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def respond(
+        self,
+        request_text: str,
+        addr_str: str = "unknown",
+        allow_keep_alive: bool = False,
+    ) -> Response:
+        """
+        Parse a request and route it to the response that should be sent.
+
+        Successful responses keep the connection open when the client asked
+        for it and ``allow_keep_alive`` is set; error responses always close.
+        """
+        req = None
 
-            request_text = self.receiver.receive(client_socket)
+        try:
             req = self.parser.parse(request_text)
+            method, path = req.method, req.path
+            keep_alive = allow_keep_alive and req.keep_alive
+            # Success lines are the bulk of logging; check the level once so
+            # a quieter server skips those calls entirely
+            info = self.logger.isEnabledFor(logging.INFO)
 
-            self.logger.info(f"{addr_str} - {req.method} {req.path} {req.version}")
+            if info:
+                self.logger.info("%s - %s %s %s", addr_str, method, path, req.version)
 
             # Increment counter for this path
             if self.counter:
-                count = self.counter.increment(req.path)
-                self.logger.debug(f"Request count for {req.path}: {count}")
+                count = self.counter.increment(path)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Request count for %s: %d", path, count)
 
-            if req.method not in SUPPORTED_METHODS:
+            if method not in SUPPORTED_METHODS:
                 self.logger.warning(
-                    f"{addr_str} - 405 Method Not Allowed: {req.method} {req.path} "
-                    f"(supported: {', '.join(sorted(SUPPORTED_METHODS))})"
+                    "%s - 405 Method Not Allowed: %s %s (supported: %s)",
+                    addr_str,
+                    method,
+                    path,
+                    self.responses.allow_header,
                 )
-                client_socket.sendall(
-                    self.responses.error(405, ", ".join(sorted(SUPPORTED_METHODS)))
-                )
-                return
+                return Response(self.responses.error(405))
 
-            target = self.files.resolve(req.path)
-            if not target:
-                self.logger.warning(f"{addr_str} - 404 Not Found: {req.path}")
-                client_socket.sendall(self.responses.error(404))
-                return
+            # One stat() answers both the type checks and Content-Length
+            found = self.files.lookup(path)
+            if not found:
+                self.logger.warning("%s - 404 Not Found: %s", addr_str, path)
+                return Response(self.responses.error(404))
+            target, st = found
 
-            if target.is_dir():
-                if not req.path.endswith("/") and req.path != "/":
-                    redirect_path = req.path + "/"
+            if stat.S_ISDIR(st.st_mode):
+                if not path.endswith("/") and path != "/":
+                    redirect_path = path + "/"
                     headers = {
                         "Location": redirect_path,
                         "Content-Length": "0",
-                        "Connection": "close",
+                        "Connection": "keep-alive" if keep_alive else "close",
                     }
-                    client_socket.sendall(self.responses.build(308, headers, b""))
-                    self.logger.info(
-                        f"{addr_str} - 308 Permanent Redirect: {req.path} -> {redirect_path}"
+                    if info:
+                        self.logger.info(
+                            "%s - 308 Permanent Redirect: %s -> %s",
+                            addr_str,
+                            path,
+                            redirect_path,
+                        )
+                    return Response(
+                        self.responses.build(308, headers, b""), keep_alive=keep_alive
                     )
-                    return
 
                 index_file = self.files.find_index(target)
                 if index_file:
-                    data = self.files.read_bytes(index_file)
-                    content_type = self.files.content_type(index_file)
-                    headers = {
-                        "Content-Type": content_type,
-                        "Content-Length": str(len(data)),
-                        "Connection": "close",
-                    }
-                    body = b"" if req.method == "HEAD" else data
-                    client_socket.sendall(self.responses.build(200, headers, body))
-                    self.logger.info(
-                        f"{addr_str} - 200 OK: {req.path} (index: {index_file.name}, {len(data)} bytes)"
+                    response = self._file_response(
+                        req, index_file, index_file.stat(), keep_alive
                     )
-                    return
+                    if info:
+                        self._log_file(addr_str, path, response, index_file.name)
+                    return response
 
                 if not self.files.allow_directory:
                     self.logger.warning(
-                        f"{addr_str} - 403 Forbidden: Directory listing disabled for {req.path}"
+                        "%s - 403 Forbidden: Directory listing disabled for %s",
+                        addr_str,
+                        path,
                     )
-                    client_socket.sendall(
+                    return Response(
                         self.responses.error(403, "Directory listing is disabled")
                     )
-                    return
 
-                entries = self.files.list_directory(target)
-                # Add request counts to directory entries if counter is available
-                if self.counter:
-                    for entry in entries:
-                        entry_path = entry["path"]
-                        entry["request_count"] = self.counter.get(entry_path)
-
-                response = self.responses.directory_listing(req.path, entries)
-                client_socket.sendall(response)
-                self.logger.info(
-                    f"{addr_str} - 200 OK: {req.path} (directory listing, {len(entries)} entries)"
+                (head, body), entry_count = self._directory_listing(
+                    path, target, st, keep_alive
                 )
-                return
-
-            if target.is_file():
-                data = self.files.read_bytes(target)
-                content_type = self.files.content_type(target)
-
-                headers = {
-                    "Content-Type": content_type,
-                    "Content-Length": str(len(data)),
-                    "Connection": "close",
-                }
-                body = b"" if req.method == "HEAD" else data
-                client_socket.sendall(self.responses.build(200, headers, body))
-                self.logger.info(f"{addr_str} - 200 OK: {req.path} ({len(data)} bytes)")
-                return
+                if info:
+                    self.logger.info(
+                        "%s - 200 OK: %s (directory listing, %d entries)",
+                        addr_str,
+                        path,
+                        entry_count,
+                    )
+                return Response(head, body=body, keep_alive=keep_alive)
+
+            if stat.S_ISREG(st.st_mode):
+                response = self._file_response(req, target, st, keep_alive)
+                if info:
+                    self._log_file(addr_str, path, response)
+                return response
 
             self.logger.warning(
-                f"{addr_str} - 404 Not Found: {req.path} (not a file or directory)"
+                "%s - 404 Not Found: %s (not a file or directory)", addr_str, path
             )
-            client_socket.sendall(self.responses.error(404))
-            return
+            return Response(self.responses.error(404))
 
         except ValueError as e:
-            request_info = f"{req.method} {req.path}" if req else "(parse failed)"
-            self.logger.error(f"{addr_str} - 400 Bad Request: {request_info} - {e}")
-            client_socket.sendall(self.responses.error(400))
+            return self._bad_request(addr_str, e, req)
         except Exception as e:
             request_info = f"{req.method} {req.path}" if req else "(unknown)"
             self.logger.exception(
-                f"{addr_str} - 500 Internal Server Error: {request_info} - {e}"
+                "%s - 500 Internal Server Error: %s - %s", addr_str, request_info, e
             )
-            client_socket.sendall(self.responses.error(500))
-        finally:
+            return Response(self.responses.error(500))
+
+    def clear_caches(self) -> None:
+        """Drop cached paths, file contents and directory listings."""
+        self.files.clear_cache()
+        with self._listing_lock:
+            self._listing_cache.clear()
+
+    def _idle_timeout(self, served: int) -> float | None:
+        """How long to wait for the next request; None for a connection's first."""
+        return self.keepalive_timeout if served else None
+
+    def _check_rate_limit(self, client_ip: str, addr_str: str) -> bool:
+        if self.rate_limiter and not self.rate_limiter.is_allowed(client_ip):
+            self.logger.warning(
+                "%s - 429 Too Many Requests: Rate limit exceeded", addr_str
+            )
+            return False
+        return True
+
+    def _bad_request(self, addr_str: str, error: ValueError, req=None) -> Response:
+        request_info = f"{req.method} {req.path}" if req else "(parse failed)"
+        self.logger.error(
+            "%s - 400 Bad Request: %s - %s", addr_str, request_info, error
+        )
+        return Response(self.responses.error(400))
+
+    def _listing_counts(self, paths: list[str]) -> tuple[int, ...]:
+        if not self.counter:
+            return ()
+        counts = self.counter.get_many(paths)
+        return tuple(counts[p] for p in paths)
+
+    def _directory_listing(
+        self, path: str, target: Path, st: os.stat_result, keep_alive: bool = False
+    ) -> tuple[tuple[bytes, bytes], int]:
+        """
+        Return the rendered listing (head, body) for a directory and its entry count.
+
+        Responses are cached per request path as well as directory, since
+        the page shows the path the client asked for and a symlink can lead
+        two URLs to one directory. They are reused while the directory's
+        mtime and the entries' request counts are unchanged. Because editing a
+        file in place does not touch the directory mtime, entries also expire
+        after listing_cache_ttl seconds so sizes and timestamps stay fresh.
+        """
+        key = (path, target, keep_alive)
+        now = time.monotonic()
+        with self._listing_lock:
+            cached = self._listing_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and now < cached[1]:
+            counts = self._listing_counts(cached[2])
+            if counts == cached[3]:
+                with self._listing_lock:
+                    if key in self._listing_cache:
+                        self._listing_cache.move_to_end(key)
+                return cached[4], cached[5]
+
+        entries = self.files.list_directory(target)
+        paths = [e["path"] for e in entries]
+        counts = self._listing_counts(paths)
+        # Add request counts to directory entries if counter is available
+        for entry, count in zip(entries, counts):
+            entry["request_count"] = count
+        parts = self.responses.directory_listing(path, entries, keep_alive)
+
+        if self.listing_cache_size > 0:
+            expires = now + self.listing_cache_ttl
+            with self._listing_lock:
+                self._listing_cache[key] = (
+                    st.st_mtime_ns, expires, paths, counts, parts, len(entries)
+                )
+                self._listing_cache.move_to_end(key)
+                while len(self._listing_cache) > self.listing_cache_size:
+                    self._listing_cache.popitem(last=False)
+
+        return parts, len(entries)
+
+    def _file_response(
+        self, req: HTTPRequest, path: Path, st: os.stat_result, keep_alive: bool = False
+    ) -> Response:
+        """
+        Build a 200 (or 304 Not Modified) response for a file.
+
+        A client whose If-None-Match or If-Modified-Since validator still
+        matches the file gets an empty 304. HEAD responses are answered from
+        the stat result alone, without touching the file contents. Small
+        files are served from the in-memory cache, together with a header
+        block serialized once per cache entry. Larger files are opened here
+        but only get a header block; the transport streams the body with
+        sendfile so the bytes never pass through Python. Content-Length for
+        those comes from fstat() on the open descriptor, so it always matches
+        what sendfile reads even if the file was replaced after the path was
+        stat()ed.
+        """
+        size = st.st_size
+        etag = _etag(st.st_mtime_ns, size)
+        if _not_modified(req, etag, st.st_mtime):
+            headers = {
+                "ETag": etag,
+                "Connection": "keep-alive" if keep_alive else "close",
+            }
+            if self.cache_control:
+                headers["Cache-Control"] = self.cache_control
+            head = self.responses.build_head(304, headers)
+            return Response(head, keep_alive=keep_alive, status=304)
+
+        if req.method != "HEAD" and size <= self.files.cache_max_file_bytes:
+            entry = self.files.cached_file(path, st)
+            head = entry.heads.get(keep_alive)
+            if head is None:
+                headers = self._file_headers(
+                    entry.content_type, len(entry.data), entry.mtime_ns, keep_alive
+                )
+                head = entry.heads[keep_alive] = self.responses.build_head(200, headers)
+            return Response(head, None, len(entry.data), entry.data, keep_alive)
+
+        content_type = self.files.content_type(path)
+        if req.method == "HEAD":
+            headers = self._file_headers(content_type, size, st.st_mtime_ns, keep_alive)
+            head = self.responses.build_head(200, headers)
+            return Response(head, file_size=size, keep_alive=keep_alive)
+
+        # Unbuffered: sendfile reads the descriptor directly, so a
+        # BufferedReader would only be an unused allocation per response
+        f = open(path, "rb", buffering=0)
+        try:
+            fst = os.fstat(f.fileno())
+            headers = self._file_headers(
+                content_type, fst.st_size, fst.st_mtime_ns, keep_alive
+            )
+            head = self.responses.build_head(200, headers)
+        except BaseException:
+            f.close()
+            raise
+        return Response(head, f, fst.st_size, keep_alive=keep_alive)
+
+    def _file_headers(
+        self, content_type: str, size: int, mtime_ns: int, keep_alive: bool
+    ) -> dict:
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(size),
+            "ETag": _etag(mtime_ns, size),
+            "Last-Modified": formatdate(mtime_ns / 1e9, usegmt=True),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if self.cache_control:
+            headers["Cache-Control"] = self.cache_control
+        return headers
+
+    def _log_file(
+        self, addr_str: str, path: str, response: Response, index: str | None = None
+    ) -> None:
+        if response.status == 304:
+            self.logger.info("%s - 304 Not Modified: %s", addr_str, path)
+        elif index:
+            self.logger.info(
+                "%s - 200 OK: %s (index: %s, %d bytes)",
+                addr_str,
+                path,
+                index,
+                response.file_size,
+            )
+        else:
+            self.logger.info(
+                "%s - 200 OK: %s (%d bytes)", addr_str, path, response.file_size
+            )
+
+    def _send(self, client_socket: socket.socket, response: Response) -> None:
+        if not response.file:
+            send_buffers(client_socket, (response.data, response.body))
+            return
+
+        with response.file as f, corked(client_socket):
+            send_buffers(client_socket, (response.data, response.body))
+            client_socket.sendfile(f, 0, response.file_size)
+
+    async def _send_async(
+        self, writer: asyncio.StreamWriter, response: Response
+    ) -> None:
+        if not response.file:
+            writer.writelines((response.data, response.body))
+            await writer.drain()
+            return
+
+        loop = asyncio.get_running_loop()
+        with response.file as f, corked(writer.get_extra_info("socket")):
+            writer.writelines((response.data, response.body))
             try:
-                client_socket.close()
-            except Exception:
-                pass
+                await loop.sendfile(writer.transport, f, 0, response.file_size)
+            except NotImplementedError:
+                # uvloop has no loop.sendfile(); copy through the transport
+                await _copy_file(loop, writer, f, response.file_size)
+            await writer.drain()
@@ -1,9 +1,22 @@
 """HTTP protocol handling - Request parsing and response building."""
 
+import asyncio
 import socket
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
 from pathlib import Path
-from typing import NamedTuple
-from .config import HEADER_END, MAX_HEADER_BYTES, SERVER_NAME, STATUS_TEXT
+from typing import BinaryIO, NamedTuple
+from .config import (
+    CLIENT_TIMEOUT_SECONDS,
+    ERROR_CACHE_SIZE,
+    HEADER_LINE_CACHE_SIZE,
+    HEADER_END,
+    MAX_HEADER_BYTES,
+    SERVER_NAME,
+    STATUS_TEXT,
+    SUPPORTED_METHODS,
+)
 from .templates import TemplateService
 
 
@@ -11,11 +24,44 @@ class HTTPRequest(NamedTuple):
     method: str
     path: str
     version: str
+    keep_alive: bool = False  # Client is willing to reuse the connection
+    # Conditional GET validators, lowercased; None when the header is absent
+    if_none_match: str | None = None
+    if_modified_since: str | None = None
+
+
+class Response(NamedTuple):
+    """
+    A serialized response ready for the transport.
+
+    ``data`` is sent first, then ``body`` (kept separate so the two can be
+    written with one scatter-gather call instead of being concatenated),
+    then ``file`` streamed with sendfile when set. The transport owns an
+    open ``file`` and closes it once sent.
+    """
+
+    data: bytes
+    file: BinaryIO | None = None
+    file_size: int = 0
+    body: bytes = b""
+    keep_alive: bool = False  # Connection stays open for another request
+    status: int = 200
+
+
+def _header_values(lowered: str, name: str, start: int) -> Iterator[str]:
+    """Yield the value of every ``name:`` header line in a lowercased head."""
+    marker = f"\n{name}:"
+    pos = lowered.find(marker, start)
+    while pos != -1:
+        pos += len(marker)
+        end = lowered.find("\n", pos)
+        yield (lowered[pos:] if end == -1 else lowered[pos:end]).strip()
+        pos = lowered.find(marker, pos)
 
 
 def normalize_path(raw_path: str) -> str:
     """Normalize request path: strip query params, ensure leading slash."""
-    path = raw_path.split("?", 1)[0]
+    path = raw_path.partition("?")[0]
 
     if not path.startswith("/"):
         path = "/" + path
@@ -23,7 +69,7 @@ def normalize_path(raw_path: str) -> str:
     return path
 
 
-def validate_http_method(method: str, valid_methods: set[str]) -> None:
+def validate_http_method(method: str, valid_methods: frozenset[str]) -> None:
     """Validate HTTP method, raise ValueError if invalid."""
     if method.upper() not in valid_methods:
         raise ValueError(f"Unsupported HTTP method: {method}")
@@ -35,14 +81,6 @@ def validate_http_version(version: str) -> None:
         raise ValueError(f"Invalid HTTP version: {version}")
 
 
-def format_http_headers(headers: dict, defaults: dict) -> dict:
-    """Merge user headers with default headers, user headers take precedence."""
-    result = dict(headers)
-    for key, value in defaults.items():
-        result.setdefault(key, value)
-    return result
-
-
 def build_status_line(status_code: int, status_text: dict) -> str:
     """Generate HTTP/1.1 status line."""
     reason = status_text.get(status_code, "OK")
@@ -50,29 +88,125 @@ def build_status_line(status_code: int, status_text: dict) -> str:
 
 
 class RequestReceiver:
-    """Reads request bytes until end-of-headers or size limit, then decodes."""
+    """Reads request bytes until end-of-headers or size limit, then decodes.
+
+    Each worker thread reads into its own preallocated buffer with recv_into,
+    so receiving a request allocates nothing until the final decode.
+    """
 
     def __init__(
         self, header_end: bytes = HEADER_END, max_header_bytes: int = MAX_HEADER_BYTES
     ):
         self.header_end = header_end
         self.max_header_bytes = max_header_bytes
+        self._local = threading.local()
+
+    def _buffer(self) -> tuple[bytearray, memoryview]:
+        local = self._local
+        if not hasattr(local, "buf"):
+            # One spare byte so an oversized request is detected, not truncated
+            local.buf = bytearray(self.max_header_bytes + 1)
+            local.view = memoryview(local.buf)
+        return local.buf, local.view
+
+    def receive(
+        self,
+        client_socket: socket.socket,
+        pending: bytearray | None = None,
+        idle_timeout: float | None = None,
+    ) -> str:
+        """
+        Read one request head from the socket.
+
+        On a persistent connection the caller passes the same ``pending``
+        buffer on every call: bytes read past the end of one request (a
+        pipelined next request) are left there and consumed first next time.
+        With ``idle_timeout`` set, the wait for the first byte of the next
+        request uses that timeout instead of the socket's, and a connection
+        that closes or times out before that byte arrives yields "" instead
+        of an error.
+        """
+        buf, view = self._buffer()
+        pos = 0
+        overlap = len(self.header_end) - 1
+
+        if pending:
+            pos = len(pending)
+            view[:pos] = pending
+            pending.clear()
+            end = buf.find(self.header_end, 0, pos)
+            if end != -1:
+                return self._split(view, end, pos, pending)
+
+        read_timeout = client_socket.gettimeout()
+        idle = idle_timeout is not None and pos == 0
+        if idle:
+            client_socket.settimeout(idle_timeout)
 
-    def receive(self, client_socket: socket.socket) -> str:
-        data = bytearray()
         try:
-            while self.header_end not in data:
-                chunk = client_socket.recv(4096)
-                if not chunk:
+            while True:
+                n = client_socket.recv_into(view[pos:])
+                if not n:
                     break
-                data.extend(chunk)
-                if len(data) > self.max_header_bytes:
+                if idle:
+                    # The request has started; give the rest the normal timeout
+                    client_socket.settimeout(read_timeout)
+                    idle = False
+                # Only rescan the new bytes, plus enough to catch a split CRLFCRLF
+                start = max(0, pos - overlap)
+                pos += n
+                end = buf.find(self.header_end, start, pos)
+                # A full buffer may just hold pipelined requests behind a
+                # short head, so only the head itself is held to the limit
+                if end != -1 and end + len(self.header_end) <= self.max_header_bytes:
+                    return self._split(view, end, pos, pending)
+                if pos > self.max_header_bytes:
                     raise ValueError("Request headers too large")
         except socket.timeout:
+            if idle:
+                return ""
             raise ValueError("Request timed out")
 
+        return self.decode(view[:pos])
+
+    def _split(
+        self, view: memoryview, end: int, pos: int, pending: bytearray | None
+    ) -> str:
+        """Decode the request head ending at ``end``; keep the rest in ``pending``."""
+        end += len(self.header_end)
+        if pending is not None and pos > end:
+            pending += view[end:pos]
+        return self.decode(view[:end])
+
+    async def receive_stream(
+        self,
+        reader: asyncio.StreamReader,
+        timeout: float = CLIENT_TIMEOUT_SECONDS,
+        idle_timeout: float | None = None,
+    ) -> str:
+        """Asyncio counterpart of receive(); the reader's limit caps header size."""
+        first = b""
+        if idle_timeout is not None:
+            try:
+                first = await asyncio.wait_for(reader.readexactly(1), idle_timeout)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                return ""
+
         try:
-            return data.decode("utf-8", errors="replace")
+            data = await asyncio.wait_for(reader.readuntil(self.header_end), timeout)
+        except asyncio.IncompleteReadError as e:
+            data = e.partial
+        except asyncio.LimitOverrunError:
+            raise ValueError("Request headers too large")
+        except asyncio.TimeoutError:
+            raise ValueError("Request timed out")
+
+        return self.decode(first + data if first else data)
+
+    @staticmethod
+    def decode(data: bytes | bytearray | memoryview) -> str:
+        try:
+            return str(data, "utf-8", errors="replace")
         except Exception:
             return ""
 
@@ -80,29 +214,57 @@ class RequestReceiver:
 class RequestParser:
     """Parses the request line into an HTTPRequest."""
 
-    VALID_METHODS = {"GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH"}
+    VALID_METHODS = frozenset(
+        {"GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH"}
+    )
 
     def parse(self, request_text: str) -> HTTPRequest:
-        if not request_text or not request_text.strip():
+        text = request_text.lstrip()
+        if not text:
             raise ValueError("Empty or invalid request")
 
-        lines = request_text.strip().splitlines()
-        if not lines:
-            raise ValueError("No request line found")
-
-        request_line = lines[0].strip()
+        # Only the request line and a few headers are used, so slice them
+        # out instead of splitting the whole head into lines
+        eol = text.find("\n")
+        request_line = (text if eol == -1 else text[:eol]).strip()
         parts = request_line.split()
         if len(parts) != 3:
             raise ValueError(f"Invalid request line format: {request_line}")
 
         method, raw_path, version = parts
 
-        validate_http_method(method, self.VALID_METHODS)
+        if method not in self.VALID_METHODS:
+            validate_http_method(method, self.VALID_METHODS)
+            method = method.upper()
         validate_http_version(version)
 
         path = normalize_path(raw_path)
 
-        return HTTPRequest(method.upper(), path, version)
+        keep_alive = version == "HTTP/1.1"
+        if eol == -1:
+            return HTTPRequest(method, path, version, keep_alive)
+
+        lowered = text.lower()
+        return HTTPRequest(
+            method,
+            path,
+            version,
+            self._keep_alive(lowered, eol, keep_alive),
+            next(_header_values(lowered, "if-none-match", eol), None),
+            next(_header_values(lowered, "if-modified-since", eol), None),
+        )
+
+    @staticmethod
+    def _keep_alive(lowered: str, start: int, default: bool) -> bool:
+        """HTTP/1.1 connections persist unless closed; HTTP/1.0 must opt in."""
+        keep_alive = default
+        for value in _header_values(lowered, "connection", start):
+            tokens = {t.strip() for t in value.split(",")}
+            if "close" in tokens:
+                return False
+            if "keep-alive" in tokens:
+                keep_alive = True
+        return keep_alive
 
 
 class ResponseBuilder:
@@ -113,32 +275,80 @@ class ResponseBuilder:
         server_name: str = SERVER_NAME,
         status_text: dict[int, str] = STATUS_TEXT,
         template_dir: Path | None = None,
+        allowed_methods: set[str] = SUPPORTED_METHODS,
     ):
         self.server_name = server_name
         self.status_text = status_text
+        self.allow_header = ", ".join(sorted(allowed_methods))
         self.template_service = TemplateService(template_dir)
+        # Fixed parts of every header block, encoded once
+        self._status_lines = {
+            code: f"{build_status_line(code, status_text)}\r\n".encode("utf-8")
+            for code in status_text
+        }
+        self._default_headers = {
+            "Connection": b"Connection: close\r\n",
+            "Server": f"Server: {server_name}\r\n".encode("utf-8"),
+        }
+        # (name, value) -> encoded "name: value\r\n"; most responses repeat
+        # the same Content-Type, Connection and Content-Length lines
+        self._header_lines: dict[tuple[str, str], bytes] = {}
+        # Canonical error responses never change, so serialize them once;
+        # 405 always lists the server's allowed methods
+        self._prebuilt_errors = {
+            code: self._build_error(
+                code, allow_header=self.allow_header if code == 405 else None
+            )
+            for code in self.status_text
+            if code >= 400
+        }
+        # Responses with a custom message or Allow header, rendered on first use
+        self._error_cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._error_cache_lock = threading.Lock()
 
     def build(
         self, status_code: int, headers: dict, body: bytes | None = None
     ) -> bytes:
-        body = body or b""
-
-        defaults = {
-            "Content-Length": str(len(body)),
-            "Connection": "close",
-            "Server": self.server_name,
-        }
-        merged_headers = format_http_headers(headers, defaults)
-
-        status_line = build_status_line(status_code, self.status_text)
+        head, body = self.build_parts(status_code, headers, body)
+        return head + body
 
-        lines = [status_line]
-        for k, v in merged_headers.items():
-            lines.append(f"{k}: {v}")
-        lines.append("")
+    def build_parts(
+        self, status_code: int, headers: dict, body: bytes | None = None
+    ) -> tuple[bytes, bytes]:
+        """Build the header block and body separately, without joining them."""
+        body = body or b""
 
-        head = "\r\n".join(lines).encode("utf-8", errors="strict") + b"\r\n"
-        return head + body
+        if "Content-Length" not in headers:
+            headers = {**headers, "Content-Length": str(len(body))}
+
+        return self.build_head(status_code, headers), body
+
+    def build_head(self, status_code: int, headers: dict) -> bytes:
+        """Build status line and headers only; the caller sends the body."""
+        status_line = self._status_lines.get(status_code)
+        if status_line is None:
+            status_line = (
+                f"{build_status_line(status_code, self.status_text)}\r\n"
+            ).encode("utf-8")
+
+        # Header lines are encoded once and reused, along with the status
+        # line and any defaults the caller didn't override
+        parts = [status_line]
+        lines = self._header_lines
+        for item in headers.items():
+            line = lines.get(item)
+            if line is None:
+                line = f"{item[0]}: {item[1]}\r\n".encode("utf-8", errors="strict")
+                if len(lines) >= HEADER_LINE_CACHE_SIZE:
+                    lines.clear()  # Hot lines come straight back
+                lines[item] = line
+            parts.append(line)
+        for name, encoded in self._default_headers.items():
+            if name not in headers:
+                parts.append(encoded)
+        parts.append(b"\r\n")
+
+        return b"".join(parts)
 
     @staticmethod
     def html_error_body(title: str, heading: str) -> bytes:
@@ -171,6 +381,32 @@ class ResponseBuilder:
         allow_header: str | None = None,
     ) -> bytes:
         """Generate standard HTML error response for given status code using templates."""
+        if message is None and allow_header is None:
+            prebuilt = self._prebuilt_errors.get(status_code)
+            if prebuilt is not None:
+                return prebuilt
+
+        key = (status_code, message, allow_header)
+        with self._error_cache_lock:
+            cached = self._error_cache.get(key)
+            if cached is not None:
+                self._error_cache.move_to_end(key)
+                return cached
+
+        response = self._build_error(status_code, message, allow_header)
+        with self._error_cache_lock:
+            self._error_cache[key] = response
+            if len(self._error_cache) > ERROR_CACHE_SIZE:
+                self._error_cache.popitem(last=False)
+        return response
+
+    def _build_error(
+        self,
+        status_code: int,
+        message: str | None = None,
+        allow_header: str | None = None,
+    ) -> bytes:
+        """Render and serialize an error response."""
         reason = self.status_text.get(status_code, "Error")
 
         html = self.template_service.render_error(
@@ -183,10 +419,20 @@ class ResponseBuilder:
         extra_headers = {"Allow": allow_header} if allow_header else None
         return self._render_html_response(status_code, html, extra_headers)
 
-    def directory_listing(self, path: str, entries: list[dict]) -> bytes:
-        """Generate directory listing HTML response using templates."""
+    def directory_listing(
+        self, path: str, entries: list[dict], keep_alive: bool = False
+    ) -> tuple[bytes, bytes]:
+        """
+        Generate a directory listing response using templates.
+
+        Returns the header block and HTML body separately so a large listing
+        is sent with one gather write instead of being copied into the head.
+        """
         html = self.template_service.render_directory(
             path=path, entries=entries, server_name=self.server_name
         )
 
-        return self._render_html_response(200, html)
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if keep_alive:
+            headers["Connection"] = "keep-alive"
+        return self.build_parts(200, headers, html.encode("utf-8"))
@@ -1,7 +1,71 @@
 """Network layer - Socket listener for accepting client connections."""
 
 import socket
-from .config import BACKLOG, CLIENT_TIMEOUT_SECONDS
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from .config import BACKLOG, CLIENT_SNDBUF_BYTES, CLIENT_TIMEOUT_SECONDS
+
+
+def tune_client_socket(sock: socket.socket, sndbuf: int = CLIENT_SNDBUF_BYTES) -> None:
+    """
+    Apply the per-connection options an accepted client socket should have.
+
+    TCP_NODELAY stops Nagle's algorithm from holding back small responses
+    while it waits for an ACK; large file bodies are coalesced with corked()
+    instead. A larger send buffer lets sendfile() queue more of a file per
+    call. ``sndbuf`` of 0 keeps the kernel's auto-tuned default.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if sndbuf > 0:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+
+
+@contextmanager
+def corked(sock) -> Iterator[None]:
+    """
+    Hold back partial TCP segments while a header block and file body are sent.
+
+    With TCP_CORK set the kernel coalesces the headers and the start of the
+    sendfile() body into full segments; uncorking flushes the remainder.
+    A no-op on platforms without TCP_CORK (it is Linux-specific).
+    """
+    cork = getattr(socket, "TCP_CORK", None)
+    if cork is None:
+        yield
+        return
+
+    sock.setsockopt(socket.IPPROTO_TCP, cork, 1)
+    try:
+        yield
+    finally:
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, cork, 0)
+        except OSError:
+            pass  # Peer already gone; nothing left to flush
+
+
+def send_buffers(sock: socket.socket, buffers: Iterable[bytes]) -> None:
+    """
+    Send several buffers in order, like sendall() on their concatenation.
+
+    Uses sendmsg() so the kernel gathers the buffers without a userland copy,
+    and falls back to one sendall() per buffer where sendmsg is unavailable.
+    """
+    views = [memoryview(b) for b in buffers if b]
+    if len(views) == 1 or not hasattr(sock, "sendmsg"):
+        # A lone buffer gains nothing from gathering; sendall loops in C
+        for view in views:
+            sock.sendall(view)
+        return
+
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= views[0].nbytes:
+                sent -= views.pop(0).nbytes
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
 
 
 class SocketListener:
@@ -13,16 +77,22 @@ class SocketListener:
         port: int,
         backlog: int = BACKLOG,
         client_timeout: int = CLIENT_TIMEOUT_SECONDS,
+        reuse_port: bool = False,
     ):
         self.host = host
         self.port = port
         self.backlog = backlog
         self.client_timeout = client_timeout
+        self.reuse_port = reuse_port
         self._server: socket.socket | None = None
 
     def start(self) -> None:
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            # Lets several worker processes bind the same port; the kernel
+            # spreads incoming connections across their listening sockets
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         server.bind((self.host, self.port))
         server.listen(self.backlog)
         server.settimeout(1.0)
@@ -33,6 +103,7 @@ class SocketListener:
             raise RuntimeError("Listener not started")
         client_socket, client_addr = self._server.accept()
         client_socket.settimeout(self.client_timeout)
+        tune_client_socket(client_socket)
         return client_socket, client_addr
 
     def close(self) -> None:
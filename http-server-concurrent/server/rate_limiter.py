@@ -2,40 +2,98 @@
 
 import threading
 import time
-from collections import defaultdict, deque
-from .config import RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
+from collections import OrderedDict
+from .config import (
+    RATE_LIMIT_MAX_TRACKED,
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_SHARDS,
+    RATE_LIMIT_WINDOW,
+)
 
 
 class RateLimiter:
     """
-    Thread-safe rate limiter using sliding window algorithm.
+    Thread-safe rate limiter using the token bucket algorithm.
 
-    Tracks request timestamps per IP and allows a maximum number of requests
-    within a time window.
+    Each IP gets a bucket holding up to ``max_requests`` tokens that refills
+    at ``max_requests / window_seconds`` tokens per second. A request consumes
+    one token; when the bucket is empty the request is rejected. Per-IP state
+    is just two floats, so every check is O(1).
+
+    Buckets are split across shards by IP, each with its own lock, so checks
+    for different clients rarely wait on each other.
+
+    Refill times come from the monotonic clock, so wall-clock adjustments
+    (NTP steps, manual changes) never grant or revoke tokens.
+
+    At most ``max_tracked`` IPs are kept. When a shard fills up, refilled
+    buckets are dropped from its least recently seen end; if none has
+    refilled, the least recently seen IP is evicted. Pruning stops at the
+    first bucket still in use, so a flood of new IPs costs O(1) amortized.
     """
 
     def __init__(
         self,
         max_requests: int = RATE_LIMIT_REQUESTS,
         window_seconds: float = RATE_LIMIT_WINDOW,
+        max_tracked: int = RATE_LIMIT_MAX_TRACKED,
+        shards: int = RATE_LIMIT_SHARDS,
     ):
         """
         Initialize the rate limiter.
 
         Args:
-            max_requests: Maximum number of requests allowed in the time window
-            window_seconds: Time window in seconds
+            max_requests: Bucket size, i.e. the largest burst allowed per IP
+            window_seconds: Seconds for an empty bucket to refill completely
+            max_tracked: Maximum number of tracked IPs
+            shards: Number of lock-protected shards (rounded up to a power of two)
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._requests = defaultdict(deque)  # IP -> deque of timestamps
-        self._lock = threading.Lock()
+        self.max_tracked = max_tracked
+        self._rate = max_requests / window_seconds  # Tokens refilled per second
+        size = 1 << max(0, shards - 1).bit_length()
+        self._mask = size - 1
+        self._max_per_shard = max(1, max_tracked // size)
+        # Each shard maps IP -> (tokens, last), least recently seen first
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(size)]
+
+    def _shard(
+        self, client_ip: str
+    ) -> tuple[threading.Lock, OrderedDict[str, tuple[float, float]]]:
+        return self._shards[hash(client_ip) & self._mask]
+
+    def _refill(
+        self,
+        buckets: dict[str, tuple[float, float]],
+        client_ip: str,
+        current_time: float,
+    ) -> float:
+        """Return the token count for an IP after refilling up to now."""
+        bucket = buckets.get(client_ip)
+        if bucket is None:
+            return float(self.max_requests)
+        tokens, last = bucket
+        return min(self.max_requests, tokens + (current_time - last) * self._rate)
+
+    def _prune(
+        self, buckets: dict[str, tuple[float, float]], current_time: float
+    ) -> None:
+        """Make room for one more IP, dropping refilled buckets oldest first."""
+        # A full bucket is the same as an unseen IP; stop at the first in use
+        while buckets:
+            ip = next(iter(buckets))
+            if self._refill(buckets, ip, current_time) < self.max_requests:
+                break
+            del buckets[ip]
+        while len(buckets) >= self._max_per_shard:
+            buckets.popitem(last=False)
 
     def is_allowed(self, client_ip: str) -> bool:
         """
         Check if a request from the given IP is allowed.
 
-        This method also records the request timestamp if allowed.
+        This method also consumes a token if the request is allowed.
 
         Args:
             client_ip: The IP address of the client
@@ -43,38 +101,39 @@ class RateLimiter:
         Returns:
             True if the request is allowed, False if rate limit exceeded
         """
-        current_time = time.time()
+        current_time = time.monotonic()
+        lock, buckets = self._shard(client_ip)
 
-        with self._lock:
-            # Get the request history for this IP
-            request_times = self._requests[client_ip]
+        with lock:
+            tokens = self._refill(buckets, client_ip, current_time)
 
-            # Remove timestamps outside the current window
-            cutoff_time = current_time - self.window_seconds
-            while request_times and request_times[0] < cutoff_time:
-                request_times.popleft()
+            if client_ip in buckets:
+                buckets.move_to_end(client_ip)
+            elif len(buckets) >= self._max_per_shard:
+                self._prune(buckets, current_time)
 
-            # Check if we're under the limit
-            if len(request_times) < self.max_requests:
-                request_times.append(current_time)
-                return True
+            if tokens < 1:
+                buckets[client_ip] = (tokens, current_time)
+                return False
 
-            return False
+            buckets[client_ip] = (tokens - 1, current_time)
+            return True
 
     def get_request_count(self, client_ip: str) -> int:
         """
-        Get the number of requests in the current window for an IP.
+        Get the number of tokens consumed from an IP's bucket.
+
+        This approximates the number of requests in the current window.
 
         Args:
             client_ip: The IP address to check
 
         Returns:
-            Number of requests in the current window
+            Number of requests counted against the current window
         """
-        current_time = time.time()
-        cutoff_time = current_time - self.window_seconds
+        current_time = time.monotonic()
+        lock, buckets = self._shard(client_ip)
 
-        with self._lock:
-            request_times = self._requests[client_ip]
-            # Count requests within the window
-            return sum(1 for t in request_times if t >= cutoff_time)
+        with lock:
+            tokens = self._refill(buckets, client_ip, current_time)
+            return round(self.max_requests - tokens)
@@ -1,21 +1,75 @@
 """Main HTTP server implementation."""
 
+import asyncio
+import os
+import queue
 import socket
 import signal
+import threading
 import logging
-from pathlib import Path
+from collections.abc import Iterator
 from concurrent.futures import ThreadPoolExecutor
-from .config import HOST, PORT, MAX_WORKERS
-from .network import SocketListener
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import uvloop
+except ImportError:  # Optional; the stdlib event loop is used without it
+    uvloop = None
+
+from .config import (
+    BACKLOG,
+    HOST,
+    MAX_HEADER_BYTES,
+    MAX_WORKERS,
+    PORT,
+    SERVER_BACKEND,
+    USE_UVLOOP,
+    WORKERS,
+)
+from .network import SocketListener, tune_client_socket
 from .http_protocol import RequestReceiver, RequestParser, ResponseBuilder
 from .services import StaticFileService
+from .templates import TEMPLATE_DIR
 from .handlers import ClientHandler
 from .counter import RequestCounter
 from .rate_limiter import RateLimiter
 
 
+@contextmanager
+def queued_logging() -> Iterator[None]:
+    """
+    Route root log records through a queue drained by a background thread.
+
+    Worker threads and the event loop then only enqueue each record instead
+    of writing it to stderr under the handler's lock. On exit the queue is
+    flushed and the original handlers are put back.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers:
+        yield
+        return
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(records)]
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        root.handlers = handlers
+
+
 class SimpleHTTPServer:
-    """Composed, extensible HTTP server with thread pool for concurrent request handling."""
+    """Composed, extensible HTTP server with concurrent request handling.
+
+    The default "threads" backend hands each accepted socket to a thread pool;
+    the "asyncio" backend serves every connection from a single event loop.
+    With workers > 1 the server forks that many processes, each running the
+    chosen backend on its own SO_REUSEPORT socket bound to the same port.
+    """
 
     def __init__(
         self,
@@ -24,14 +78,23 @@ class SimpleHTTPServer:
         base_dir: str = "public",
         allow_directory_listing: bool = False,
         max_workers: int = MAX_WORKERS,
+        backend: str = SERVER_BACKEND,
+        workers: int = WORKERS,
     ):
         self.host = host
         self.port = port
         self.max_workers = max_workers
-        self.listener = SocketListener(host, port)
+        self.backend = backend
+        self.workers = workers
+        self.listener = SocketListener(host, port, reuse_port=workers > 1)
         self.logger = logging.getLogger(__name__)
         self._shutdown_requested = False
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Accepted (socket, addr) pairs for the worker threads; None stops one
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._children: list[int] = []
 
         receiver = RequestReceiver()
         parser = RequestParser()
@@ -39,8 +102,7 @@ class SimpleHTTPServer:
             base_dir=base_dir, allow_directory=allow_directory_listing
         )
 
-        template_dir = Path(__file__).parent / "templates"
-        responses = ResponseBuilder(template_dir=template_dir)
+        responses = ResponseBuilder(template_dir=TEMPLATE_DIR)
 
         # Create thread-safe counter and rate limiter
         counter = RequestCounter()
@@ -54,7 +116,27 @@ class SimpleHTTPServer:
         """Signal the server to stop accepting connections."""
         self._shutdown_requested = True
         self.logger.info("Shutdown signal received")
-        self.executor.shutdown(wait=True, cancel_futures=False)
+        if self._children:
+            for pid in self._children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            return
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def reload(self) -> None:
+        """Clear the caches, e.g. after files or symlinks under base_dir moved."""
+        if self._children:
+            for pid in self._children:
+                try:
+                    os.kill(pid, signal.SIGHUP)
+                except ProcessLookupError:
+                    pass
+            return
+        self.handler.clear_caches()
+        self.logger.info("Caches cleared")
 
     def serve_forever(self) -> None:
         """Start the server and handle requests until shutdown is requested."""
@@ -64,23 +146,46 @@ class SimpleHTTPServer:
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload())
+
+        if self.workers > 1:
+            if hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT"):
+                self._serve_workers()
+                return
+            self.logger.warning(
+                "Multiple workers need fork() and SO_REUSEPORT; "
+                "running a single process"
+            )
+            self.workers = 1
+            self.listener.reuse_port = False
+
+        # Started here rather than before forking, so each serving process
+        # owns its listener thread
+        with queued_logging():
+            if self.backend == "asyncio":
+                self._serve_asyncio()
+            else:
+                self._serve_threads()
 
+    def _serve_threads(self) -> None:
+        """Run the thread pool backend until shutdown is requested."""
         self.listener.start()
-        self.logger.info(f"Server started on {self.host}:{self.port}")
-        self.logger.info(f"Thread pool size: {self.max_workers} workers")
+        self._start_workers()
+        self.logger.info("Server started on %s:%d", self.host, self.port)
+        self.logger.info("Thread pool size: %d workers", self.max_workers)
         self.logger.info("Press Ctrl+C to stop the server")
 
         try:
             while not self._shutdown_requested:
                 try:
                     client_socket, client_addr = self.listener.accept()
-                    self.logger.info(
-                        f"Connection from {client_addr[0]}:{client_addr[1]}"
-                    )
-                    # Submit to thread pool instead of handling directly
-                    self.executor.submit(
-                        self._handle_client, client_socket, client_addr
-                    )
+                    if self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info(
+                            "Connection from %s:%d", client_addr[0], client_addr[1]
+                        )
+                    # Hand off to the worker pool instead of handling directly
+                    self._jobs.put((client_socket, client_addr))
                 except socket.timeout:
                     continue
                 except OSError:
@@ -91,20 +196,141 @@ class SimpleHTTPServer:
             self.logger.info("Keyboard interrupt received")
             self._shutdown_requested = True
         except Exception as e:
-            self.logger.exception(f"Fatal server error: {e}")
+            self.logger.exception("Fatal server error: %s", e)
         finally:
             self.logger.info("Server shutting down gracefully")
-            self.executor.shutdown(wait=True)
             self.listener.close()
+            self._stop_workers()
+
+    def _start_workers(self) -> None:
+        """Start the long-lived worker threads that drain the job queue."""
+        for i in range(self.max_workers):
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _stop_workers(self) -> None:
+        """Let queued connections finish, then stop and join every worker."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._handle_client(*job)
 
     def _handle_client(self, client_socket: socket.socket, client_addr: tuple) -> None:
         """Handle a client connection in a thread."""
         try:
             self.handler.handle(client_socket, client_addr)
         except Exception as e:
-            self.logger.error(f"Error handling client {client_addr}: {e}")
+            self.logger.error("Error handling client %s: %s", client_addr, e)
         finally:
             try:
                 client_socket.close()
             except Exception:
                 pass
+
+    def _serve_workers(self) -> None:
+        """Fork worker processes that each accept on a SO_REUSEPORT socket."""
+        for _ in range(self.workers):
+            pid = os.fork()
+            if pid == 0:
+                # Child: serve on its own listener until SIGTERM from the parent
+                self.workers = 1
+                self._children = []
+                try:
+                    self.serve_forever()
+                finally:
+                    os._exit(0)
+            self._children.append(pid)
+
+        self.logger.info(
+            "Started %d worker processes on %s:%d", self.workers, self.host, self.port
+        )
+
+        try:
+            for pid in self._children:
+                os.waitpid(pid, 0)
+        except KeyboardInterrupt:
+            self.logger.info("Keyboard interrupt received")
+            self.shutdown()
+            for pid in self._children:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+        finally:
+            self.logger.info("All worker processes stopped")
+
+    def _serve_asyncio(self) -> None:
+        """Run the asyncio backend until shutdown is requested."""
+        run = uvloop.run if uvloop and USE_UVLOOP else asyncio.run
+        try:
+            run(self._serve_async())
+        except KeyboardInterrupt:
+            self.logger.info("Keyboard interrupt received")
+            self._shutdown_requested = True
+        except Exception as e:
+            self.logger.exception("Fatal server error: %s", e)
+        finally:
+            self.logger.info("Server shutting down gracefully")
+            self._loop = None
+
+    async def _serve_async(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._shutdown_requested:
+            return
+
+        # Blocking filesystem work runs on a pool bounded by max_workers
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_workers)
+        )
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self.shutdown)
+            except NotImplementedError:
+                pass  # e.g. Windows; the signal.signal handlers stay in place
+        if hasattr(signal, "SIGHUP"):
+            self._loop.add_signal_handler(signal.SIGHUP, self.reload)
+
+        server = await asyncio.start_server(
+            self._handle_stream,
+            self.host,
+            self.port,
+            backlog=BACKLOG,
+            reuse_address=True,
+            reuse_port=self.listener.reuse_port or None,
+            limit=MAX_HEADER_BYTES,
+        )
+        self.logger.info("Server started on %s:%d", self.host, self.port)
+        self.logger.info(
+            "Backend: %s event loop (%d file I/O workers)",
+            "uvloop" if uvloop and USE_UVLOOP else "asyncio",
+            self.max_workers,
+        )
+        self.logger.info("Press Ctrl+C to stop the server")
+
+        async with server:
+            await self._stop.wait()
+
+    async def _handle_stream(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle a client connection as an asyncio task."""
+        client_addr = writer.get_extra_info("peername")
+        tune_client_socket(writer.get_extra_info("socket"))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Connection from %s:%d", client_addr[0], client_addr[1])
+        try:
+            await self.handler.handle_async(reader, writer)
+        except Exception as e:
+            self.logger.error("Error handling client %s: %s", client_addr, e)
@@ -1,9 +1,19 @@
 """File serving services - Static file resolution and content type detection."""
 
-from pathlib import Path
-from typing import TypedDict
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple, TypedDict
 import mimetypes
-from .config import INDEX_FILES
+from .config import (
+    FILE_CACHE_MAX_BYTES,
+    FILE_CACHE_MAX_FILE_BYTES,
+    INDEX_FILES,
+    PATH_CACHE_SIZE,
+)
 
 
 class DirectoryEntry(TypedDict):
@@ -17,49 +27,201 @@ class DirectoryEntry(TypedDict):
     path: str
 
 
-def is_safe_path(target: Path, base: Path) -> bool:
-    """Check if target path is within base directory (prevents path traversal)."""
+def is_safe_path(target: str, base: str) -> bool:
+    """
+    Check if target path is within base directory (prevents path traversal).
+
+    Both paths must already be absolute and normalized; this only compares
+    strings, so it never touches the filesystem.
+    """
+    return target == base or target.startswith(base.rstrip(os.sep) + os.sep)
+
+
+# Extension -> MIME type, built once; guess_type() would run a regex per call
+mimetypes.init()
+_SUFFIX_TYPES: dict[str, str] = dict(mimetypes.types_map)
+
+
+# Skip the atime update a plain read would write back (Linux only)
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+
+def read_file(path: Path) -> tuple[bytes, os.stat_result]:
+    """
+    Read a whole file through a single descriptor.
+
+    Returns the contents with the descriptor's fstat(), so the size and
+    mtime describe exactly the bytes that were read.
+    """
     try:
-        target.relative_to(base)
-        return True
-    except ValueError:
-        return False
+        fd = os.open(path, os.O_RDONLY | _O_NOATIME)
+    except PermissionError:
+        if not _O_NOATIME:
+            raise
+        fd = os.open(path, os.O_RDONLY)  # O_NOATIME needs file ownership
+    try:
+        st = os.fstat(fd)
+        data = os.read(fd, st.st_size)
+        while len(data) < st.st_size:
+            chunk = os.read(fd, st.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    return data, st
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
 
 def format_file_size(size_bytes: int) -> str:
     """Format bytes as human-readable size (e.g., 1.2 KB, 3.4 MB)."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} PB"
+    # Each unit spans 10 bits, so the bit length picks it without a loop
+    exp = min(max(0, (size_bytes.bit_length() - 1) // 10), len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << 10 * exp):.1f} {_SIZE_UNITS[exp]}"
+
+
+class CachedFile(NamedTuple):
+    """A small file held in memory, valid while its size and mtime match."""
+
+    size: int
+    mtime_ns: int
+    data: bytes
+    content_type: str
+    # Serialized 200 header blocks for this file, filled in by the handler
+    heads: dict
+
+
+class FileCache:
+    """
+    Thread-safe LRU cache of small file contents.
+
+    Entries are keyed by resolved path and validated against the caller's
+    stat() result, so a modified file misses and is re-read. Only files up
+    to ``max_file_bytes`` are kept, and the total is bounded by ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = FILE_CACHE_MAX_BYTES,
+        max_file_bytes: int = FILE_CACHE_MAX_FILE_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries: OrderedDict[Path, CachedFile] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, st: os.stat_result) -> CachedFile | None:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+                self._entries.move_to_end(path)
+                return entry
+        return None
+
+    def put(
+        self, path: Path, st: os.stat_result, data: bytes, content_type: str
+    ) -> CachedFile:
+        """Insert a file, evicting old entries over the budget."""
+        entry = CachedFile(st.st_size, st.st_mtime_ns, data, content_type, {})
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self._bytes -= len(old.data)
+            self._entries[path] = entry
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
 
 
 class StaticFileService:
     """Resolves safe file paths and determines content types."""
 
-    def __init__(self, base_dir: str = "public", allow_directory: bool = False):
+    def __init__(
+        self,
+        base_dir: str = "public",
+        allow_directory: bool = False,
+        cache_max_bytes: int = FILE_CACHE_MAX_BYTES,
+        cache_max_file_bytes: int = FILE_CACHE_MAX_FILE_BYTES,
+        path_cache_size: int = PATH_CACHE_SIZE,
+    ):
         self.base_dir = Path(base_dir).resolve()
         self.allow_directory = allow_directory
-
-    def resolve(self, request_path: str) -> Path | None:
-        relative = request_path.lstrip("/")
-        target = (self.base_dir / relative).resolve()
-
-        if not is_safe_path(target, self.base_dir):
+        self.cache_max_file_bytes = cache_max_file_bytes
+        self.cache = FileCache(cache_max_bytes, cache_max_file_bytes)
+        self.path_cache_size = path_cache_size
+        # Request path -> resolved target, or None if it escapes base_dir
+        self._paths: OrderedDict[str, Path | None] = OrderedDict()
+        self._paths_lock = threading.Lock()
+
+    def _resolve_path(self, request_path: str) -> Path | None:
+        """
+        Map a request path to an absolute path inside base_dir, or None.
+
+        ``..`` segments are collapsed with normpath() first, which needs no
+        syscalls and turns traversal attempts away immediately. Paths that
+        stay inside are then passed through realpath() so a symlink pointing
+        out of base_dir is still refused; that walks every component with
+        lstat(), so results are memoized per request path. base_dir is fixed
+        for the life of the service; moving symlinks inside it while serving
+        is not supported.
+        """
+        with self._paths_lock:
+            if request_path in self._paths:
+                self._paths.move_to_end(request_path)
+                return self._paths[request_path]
+
+        base = str(self.base_dir)
+        target = None
+        candidate = os.path.normpath(os.path.join(base, request_path.lstrip("/")))
+        if is_safe_path(candidate, base):
+            real = os.path.realpath(candidate)
+            if is_safe_path(real, base):
+                target = Path(real)
+
+        if self.path_cache_size > 0:
+            with self._paths_lock:
+                self._paths[request_path] = target
+                while len(self._paths) > self.path_cache_size:
+                    self._paths.popitem(last=False)
+        return target
+
+    def clear_cache(self) -> None:
+        """Forget memoized path resolutions and cached file contents."""
+        with self._paths_lock:
+            self._paths.clear()
+        self.cache.clear()
+
+    def lookup(self, request_path: str) -> tuple[Path, os.stat_result] | None:
+        """Resolve a request path and stat it, returning None unless it is a
+        regular file or directory inside base_dir."""
+        target = self._resolve_path(request_path)
+        if target is None:
             return None
 
-        if not target.exists():
+        try:
+            st = target.stat()
+        except OSError:
             return None
 
-        if target.is_file():
-            return target
-
-        if target.is_dir():
-            return target
+        if stat.S_ISREG(st.st_mode) or stat.S_ISDIR(st.st_mode):
+            return target, st
 
         return None
 
+    def resolve(self, request_path: str) -> Path | None:
+        found = self.lookup(request_path)
+        return found[0] if found else None
+
     def find_index(self, directory: Path) -> Path | None:
         """Return index file path if present in the directory."""
         if not directory.is_dir():
@@ -73,12 +235,35 @@ class StaticFileService:
                 continue
         return None
 
-    def read_bytes(self, path: Path) -> bytes:
-        return path.read_bytes()
+    def cached_file(self, path: Path, st: os.stat_result) -> CachedFile:
+        """
+        Return a small file's cache entry, reading it on a miss.
+
+        ``st`` must be a fresh stat() of ``path`` and the file must fit in
+        cache_max_file_bytes.
+        """
+        entry = self.cache.get(path, st)
+        if entry is None:
+            data, st = read_file(path)
+            entry = self.cache.put(path, st, data, self.content_type(path))
+        return entry
+
+    def read_bytes(self, path: Path, st: os.stat_result | None = None) -> bytes:
+        """
+        Read file contents, serving small files from an in-memory LRU cache.
+
+        Cache entries are validated against the file's size and mtime, so a
+        modified file is re-read on the next request. Callers that already
+        hold a fresh stat() result can pass it to skip another syscall.
+        """
+        if st is None:
+            st = path.stat()
+        if st.st_size > self.cache_max_file_bytes:
+            return read_file(path)[0]
+        return self.cached_file(path, st).data
 
     def content_type(self, path: Path) -> str:
-        mimetype, _ = mimetypes.guess_type(str(path))
-        return mimetype or "application/octet-stream"
+        return _SUFFIX_TYPES.get(path.suffix.lower(), "application/octet-stream")
 
     def list_directory(self, directory: Path) -> list[DirectoryEntry]:
         """
@@ -90,77 +275,72 @@ class StaticFileService:
         if not directory.is_dir():
             return []
 
-        entries: list[DirectoryEntry] = []
-
         try:
-            relative = directory.relative_to(self.base_dir)
-            if str(relative) != ".":
-                parent_path = "/" + str(relative.parent).replace("\\", "/")
-                if parent_path.endswith("/."):
-                    parent_path = "/"
-                entries.append(
-                    DirectoryEntry(
-                        name="..",
-                        type="directory",
-                        size=None,
-                        size_formatted="-",
-                        modified="-",
-                        path=parent_path,
-                    )
-                )
+            relative = directory.relative_to(self.base_dir).as_posix()
         except ValueError:
-            pass
+            return []
 
-        try:
-            items = sorted(
-                directory.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())
+        entries: list[DirectoryEntry] = []
+        if relative == ".":
+            prefix = "/"
+        else:
+            prefix = f"/{relative}/"
+            parent_path = "/" + str(PurePosixPath(relative).parent)
+            if parent_path.endswith("/."):
+                parent_path = "/"
+            entries.append(
+                DirectoryEntry(
+                    name="..",
+                    type="directory",
+                    size=None,
+                    size_formatted="-",
+                    modified="-",
+                    path=parent_path,
+                )
             )
+
+        # scandir() gets each entry's type from the directory read itself
+        # and caches it, so sorting and classifying cost no extra syscalls;
+        # only the stat() for size and mtime touches the inode
+        try:
+            with os.scandir(directory) as it:
+                items = [item for item in it if not item.name.startswith(".")]
         except PermissionError:
             return entries
 
-        for item in items:
-            if item.name.startswith("."):
-                continue
+        items.sort(key=lambda item: (not item.is_dir(), item.name.lower()))
 
+        for item in items:
             try:
-                rel_path = item.relative_to(self.base_dir)
-                url_path = "/" + str(rel_path).replace("\\", "/")
-                if item.is_dir():
-                    url_path += "/"
-            except ValueError:
+                st = item.stat()
+            except OSError:
                 continue
 
-            try:
-                stat = item.stat()
-                modified = self._format_timestamp(stat.st_mtime)
-
-                if item.is_file():
-                    size = stat.st_size
-                    size_formatted = format_file_size(size)
-                    entry_type = "file"
-                else:
-                    size = None
-                    size_formatted = "-"
-                    entry_type = "directory"
-
+            if item.is_dir():
                 entries.append(
                     DirectoryEntry(
                         name=item.name,
-                        type=entry_type,
-                        size=size,
-                        size_formatted=size_formatted,
-                        modified=modified,
-                        path=url_path,
+                        type="directory",
+                        size=None,
+                        size_formatted="-",
+                        modified=self._format_timestamp(st.st_mtime),
+                        path=f"{prefix}{item.name}/",
+                    )
+                )
+            else:
+                entries.append(
+                    DirectoryEntry(
+                        name=item.name,
+                        type="file",
+                        size=st.st_size,
+                        size_formatted=format_file_size(st.st_size),
+                        modified=self._format_timestamp(st.st_mtime),
+                        path=f"{prefix}{item.name}",
                     )
                 )
-            except (OSError, PermissionError):
-                continue
 
         return entries
 
     def _format_timestamp(self, timestamp: float) -> str:
         """Format Unix timestamp as human-readable string."""
-        from datetime import datetime
-
-        dt = datetime.fromtimestamp(timestamp)
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
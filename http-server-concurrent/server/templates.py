@@ -1,11 +1,140 @@
 """Template service for rendering HTML pages."""
 
+import html
+import itertools
+import string
 from pathlib import Path
 from typing import Any
 
 
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# Placeholders each template may use
+_TEMPLATE_FIELDS = {
+    "error": frozenset({"status_code", "status_text", "message", "server_name"}),
+    "directory": frozenset(
+        {"path", "breadcrumbs", "entry_rows", "server_name", "entry_count"}
+    ),
+}
+
+# Minimal fallback templates (no styling), used when a file is missing or invalid
+_INLINE_TEMPLATES = {
+    "error": """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{status_code} {status_text}</title>
+</head>
+<body>
+    <h1>{status_code} {status_text}</h1>
+    <p>{message}</p>
+    <hr>
+    <p><a href="/">Back to Home</a></p>
+    <footer><small>{server_name}</small></footer>
+</body>
+</html>""",
+    "directory": """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Index of {path}</title>
+</head>
+<body>
+    <h1>Index of {path}</h1>
+    <p>{breadcrumbs}</p>
+    <hr>
+    <p>{entry_count} items</p>
+    <table border="1" cellpadding="5" cellspacing="0">
+        <thead>
+            <tr>
+                <th>Icon</th>
+                <th>Name</th>
+                <th>Size</th>
+                <th>Modified</th>
+            </tr>
+        </thead>
+        <tbody>
+{entry_rows}
+        </tbody>
+    </table>
+    <hr>
+    <footer><small>{server_name}</small></footer>
+</body>
+</html>""",
+}
+
+# (literal text, field formatted after it or None, format spec) pieces
+CompiledTemplate = tuple[tuple[str, str | None, str], ...]
+
+
+def compile_template(template: str, fields: frozenset[str]) -> CompiledTemplate:
+    """
+    Split a str.format-style template into literal and placeholder pieces.
+
+    The format string is parsed once here, so rendering only joins the
+    pieces. Raises ValueError for malformed templates, conversions, or
+    placeholders outside ``fields``, the cases where format() would fail.
+    """
+    pieces = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (conversion or field not in fields):
+            raise ValueError(f"Unsupported template field: {field!r}")
+        pieces.append((literal, field, spec or ""))
+    return tuple(pieces)
+
+
+def render_template(compiled: CompiledTemplate, values: dict[str, Any]) -> str:
+    """Fill a compiled template's placeholders from ``values``."""
+    return "".join(
+        [
+            literal if field is None else literal + format(values[field], spec)
+            for literal, field, spec in compiled
+        ]
+    )
+
+
+_FILE_ICONS = {
+    ".html": "📄",
+    ".htm": "📄",
+    ".css": "🎨",
+    ".js": "📜",
+    ".json": "📋",
+    ".xml": "📋",
+    ".txt": "📝",
+    ".md": "📝",
+    ".pdf": "📕",
+    ".doc": "📘",
+    ".docx": "📘",
+    ".xls": "📗",
+    ".xlsx": "📗",
+    ".png": "🖼️",
+    ".jpg": "🖼️",
+    ".jpeg": "🖼️",
+    ".gif": "🖼️",
+    ".svg": "🖼️",
+    ".mp3": "🎵",
+    ".wav": "🎵",
+    ".mp4": "🎬",
+    ".avi": "🎬",
+    ".zip": "📦",
+    ".tar": "📦",
+    ".gz": "📦",
+    ".py": "🐍",
+    ".java": "☕",
+    ".c": "©️",
+    ".cpp": "©️",
+    ".h": "©️",
+}
+
+
 class TemplateService:
-    """Service for loading and rendering HTML templates."""
+    """Service for loading and rendering HTML templates.
+
+    Templates are read from disk and compiled once at construction;
+    rendering never touches the filesystem or re-parses a format string.
+    """
 
     def __init__(self, template_dir: Path | None = None):
         """
@@ -15,14 +144,19 @@ class TemplateService:
             template_dir: Directory containing template files. If None, uses inline templates.
         """
         self.template_dir = template_dir
-        if template_dir and template_dir.exists():
+        if template_dir and template_dir.is_dir():
             self._use_files = True
         else:
             self._use_files = False
+        self._cache = {name: self._read_template(name) for name in _TEMPLATE_FIELDS}
+        self._compiled = {
+            name: self._compile(name, template)
+            for name, template in self._cache.items()
+        }
 
     def load_template(self, name: str) -> str:
         """
-        Load template from file or return inline version.
+        Return the preloaded template, loading unknown names on demand.
 
         Args:
             name: Template name (without .html extension)
@@ -30,16 +164,30 @@ class TemplateService:
         Returns:
             Template content as string
         """
+        template = self._cache.get(name)
+        if template is None:
+            template = self._read_template(name)
+        return template
+
+    def _read_template(self, name: str) -> str:
+        """Read template from file or return inline version."""
         if self._use_files:
             template_path = self.template_dir / f"{name}.html"
-            if template_path.exists():
-                try:
-                    return template_path.read_text(encoding="utf-8")
-                except (OSError, UnicodeDecodeError):
-                    pass
+            try:
+                return template_path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                pass
 
         return self._get_inline_template(name)
 
+    def _compile(self, name: str, template: str) -> CompiledTemplate:
+        """Compile a loaded template, falling back to the inline version."""
+        fields = _TEMPLATE_FIELDS[name]
+        try:
+            return compile_template(template, fields)
+        except ValueError:
+            return compile_template(self._get_inline_template(name), fields)
+
     def render_error(
         self, status_code: int, status_text: str, message: str, server_name: str
     ) -> str:
@@ -55,22 +203,15 @@ class TemplateService:
         Returns:
             Rendered HTML as string
         """
-        template = self.load_template("error")
-        try:
-            return template.format(
-                status_code=status_code,
-                status_text=status_text,
-                message=message,
-                server_name=server_name,
-            )
-        except (KeyError, ValueError):
-            fallback = self._get_inline_template("error")
-            return fallback.format(
-                status_code=status_code,
-                status_text=status_text,
-                message=message,
-                server_name=server_name,
-            )
+        return render_template(
+            self._compiled["error"],
+            {
+                "status_code": status_code,
+                "status_text": status_text,
+                "message": message,
+                "server_name": server_name,
+            },
+        )
 
     def render_directory(
         self, path: str, entries: list[dict[str, Any]], server_name: str
@@ -86,156 +227,61 @@ class TemplateService:
         Returns:
             Rendered HTML as string
         """
-        template = self.load_template("directory")
-
-        breadcrumbs = self._generate_breadcrumbs(path)
-        entry_rows = self._generate_entry_rows(entries)
-
-        try:
-            return template.format(
-                path=path,
-                breadcrumbs=breadcrumbs,
-                entry_rows=entry_rows,
-                server_name=server_name,
-                entry_count=len(entries),
-            )
-        except (KeyError, ValueError):
-            fallback = self._get_inline_template("directory")
-            return fallback.format(
-                path=path,
-                breadcrumbs=breadcrumbs,
-                entry_rows=entry_rows,
-                server_name=server_name,
-                entry_count=len(entries),
-            )
+        return render_template(
+            self._compiled["directory"],
+            {
+                "path": html.escape(path),
+                "breadcrumbs": self._generate_breadcrumbs(path),
+                "entry_rows": self._generate_entry_rows(entries),
+                "server_name": server_name,
+                "entry_count": len(entries),
+            },
+        )
 
     def _generate_breadcrumbs(self, path: str) -> str:
         """Generate breadcrumb navigation HTML."""
-        parts = [p for p in path.split("/") if p]
+        parts = [html.escape(p) for p in path.split("/") if p]
         if not parts:
             return '<a href="/">Home</a>'
 
-        crumbs = ['<a href="/">Home</a>']
-        current_path = ""
-
-        for part in parts:
-            current_path += f"/{part}"
-            crumbs.append(f'<a href="{current_path}">{part}</a>')
-
-        return " / ".join(crumbs)
+        # Cumulative hrefs: "/a", "/a/b", "/a/b/c", ...
+        hrefs = itertools.accumulate(parts, lambda acc, p: f"{acc}/{p}", initial="")
+        next(hrefs)  # Skip the empty initial value
+        return " / ".join(
+            [
+                '<a href="/">Home</a>',
+                *(f'<a href="{href}">{part}</a>' for href, part in zip(hrefs, parts)),
+            ]
+        )
 
     def _generate_entry_rows(self, entries: list[dict[str, Any]]) -> str:
         """Generate table rows for directory entries."""
         if not entries:
             return '<tr><td colspan="5" class="empty">Empty directory</td></tr>'
 
-        rows = []
-        for entry in entries:
-            entry_type = entry["type"]
-            icon = (
-                "📁"
-                if entry_type == "directory"
-                else self._get_file_icon(entry["name"])
-            )
-            size = entry.get("size_formatted", "-")
-            modified = entry.get("modified", "-")
-            request_count = entry.get("request_count", 0)
-
-            row = f"""
-                <tr class="{entry_type}">
-                    <td class="icon">{icon}</td>
-                    <td class="name"><a href="{entry["path"]}">{entry["name"]}</a></td>
-                    <td class="size">{size}</td>
-                    <td class="modified">{modified}</td>
-                    <td class="requests">{request_count}</td>
-                </tr>"""
-            rows.append(row)
-
-        return "\n".join(rows)
+        icon = self._get_file_icon
+        # File names come from disk and may contain markup characters
+        escape = html.escape
+        return "\n".join(
+            f'<tr class="{e["type"]}">'
+            '<td class="icon">'
+            f'{"📁" if e["type"] == "directory" else icon(e["name"])}</td>'
+            f'<td class="name"><a href="{escape(e["path"])}">'
+            f'{escape(e["name"])}</a></td>'
+            f'<td class="size">{e.get("size_formatted", "-")}</td>'
+            f'<td class="modified">{e.get("modified", "-")}</td>'
+            f'<td class="requests">{e.get("request_count", 0)}</td>'
+            "</tr>"
+            for e in entries
+        )
 
     def _get_file_icon(self, filename: str) -> str:
         """Get icon emoji for file based on extension."""
-        ext = Path(filename).suffix.lower()
-        icons = {
-            ".html": "📄",
-            ".htm": "📄",
-            ".css": "🎨",
-            ".js": "📜",
-            ".json": "📋",
-            ".xml": "📋",
-            ".txt": "📝",
-            ".md": "📝",
-            ".pdf": "📕",
-            ".doc": "📘",
-            ".docx": "📘",
-            ".xls": "📗",
-            ".xlsx": "📗",
-            ".png": "🖼️",
-            ".jpg": "🖼️",
-            ".jpeg": "🖼️",
-            ".gif": "🖼️",
-            ".svg": "🖼️",
-            ".mp3": "🎵",
-            ".wav": "🎵",
-            ".mp4": "🎬",
-            ".avi": "🎬",
-            ".zip": "📦",
-            ".tar": "📦",
-            ".gz": "📦",
-            ".py": "🐍",
-            ".java": "☕",
-            ".c": "©️",
-            ".cpp": "©️",
-            ".h": "©️",
-        }
-        return icons.get(ext, "📄")
+        # Slice the extension off directly rather than building a Path per entry
+        dot = filename.rfind(".")
+        ext = filename[dot:].lower() if dot > 0 else ""
+        return _FILE_ICONS.get(ext, "📄")
 
     def _get_inline_template(self, name: str) -> str:
         """Get minimal inline template as fallback (no styling)."""
-        templates = {
-            "error": """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{status_code} {status_text}</title>
-</head>
-<body>
-    <h1>{status_code} {status_text}</h1>
-    <p>{message}</p>
-    <hr>
-    <p><a href="/">Back to Home</a></p>
-    <footer><small>{server_name}</small></footer>
-</body>
-</html>""",
-            "directory": """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Index of {path}</title>
-</head>
-<body>
-    <h1>Index of {path}</h1>
-    <p>{breadcrumbs}</p>
-    <hr>
-    <p>{entry_count} items</p>
-    <table border="1" cellpadding="5" cellspacing="0">
-        <thead>
-            <tr>
-                <th>Icon</th>
-                <th>Name</th>
-                <th>Size</th>
-                <th>Modified</th>
-            </tr>
-        </thead>
-        <tbody>
-{entry_rows}
-        </tbody>
-    </table>
-    <hr>
-    <footer><small>{server_name}</small></footer>
-</body>
-</html>""",
-        }
-        return templates.get(name, "")
+        return _INLINE_TEMPLATES.get(name, "")
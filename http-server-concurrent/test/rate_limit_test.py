@@ -30,7 +30,10 @@ def test_rate_limit_spam(url: str, num_requests: int = 20):
     """
     Test rate limiting by spamming requests as fast as possible.
 
-    Expected: First 5 requests succeed (200), rest are rate limited (429).
+    Expected: The first 5 requests spend the bucket's burst capacity (200).
+    After that only refilled tokens (5 per second) get through, so roughly
+    every fourth request at this pace succeeds and the rest are rate
+    limited (429).
     """
     print(f"\n{'=' * 60}")
     print("Test: Spamming requests (exceeding rate limit)")
@@ -101,7 +104,7 @@ def main():
 
     print("Rate Limiting Test")
     print("=" * 60)
-    print("\nDefault rate limit: 5 requests per second per IP")
+    print("\nDefault rate limit: bursts of 5, refilled at 5 requests/second per IP")
     print("Make sure the server is running before proceeding!")
     print("Start the server with: python -m server")
     input("\nPress Enter to continue...")